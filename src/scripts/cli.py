@@ -0,0 +1,134 @@
+import argparse
+import importlib
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from common.paths import DATASETS_DIR, MODELS_DIR
+
+# Pipeline stages, as (module, positional arguments, whether the stage uses the models)
+# The modules are only imported by the subcommand that runs them
+COMMANDS = {
+    'cryptomap-ingestion': ('cryptomap.ingestion', [], False),
+    'cryptomap-processing': ('cryptomap.processing', [], False),
+    'ohlcv-ingestion': ('ohlcv.ingestion', ['start_date', 'end_date'], False),
+    'ohlcv-processing': ('ohlcv.processing', ['start_date', 'end_date'], False),
+    'stocktwits-ingestion': ('stocktwits.ingestion', [], False),
+    'stocktwits-processing': ('stocktwits.processing', ['start_date', 'end_date'], False),
+    'stocktwits-enhancing': ('stocktwits.enhancing', ['start_date', 'end_date'], False),
+    'stocktwits-indexing': ('stocktwits.indexing', [], False),
+    'stocktwits-classifying': ('stocktwits.classifying', [], True),
+    'stocktwits-classifying-chunk': ('stocktwits.classifying2', ['chunk'], True),
+    'market-correlating': ('market.correlating', ['window', 'min_lag', 'max_lag'], False),
+}
+ARGS = {
+    'start_date': (datetime.fromisoformat, "start date, in iso format (e.g. 2019-06-01)"),
+    'end_date': (datetime.fromisoformat, "end date, in iso format (e.g. 2022-06-01)"),
+    'chunk': (int, "index of the chunk of twits to be classified"),
+    'window': (int, "size of the rolling window, in hours"),
+    'min_lag': (int, "smallest lag of the returns, in hours (negative lags mean that the returns lead)"),
+    'max_lag': (int, "largest lag of the returns, in hours"),
+}
+
+
+
+#------------------------------#
+#--- AUXILIARY FUNCTIONS ------#
+#------------------------------#
+
+def get_parser():
+    """Builds the parser of the command line arguments.
+
+    Returns:
+        argparse.ArgumentParser: parser with one subcommand for each pipeline stage
+    """
+
+    parser = argparse.ArgumentParser(description="Runs the stages of the data pipeline.")
+    parser.add_argument('--datasets-dir', type=pathlib.Path, default=DATASETS_DIR, help=f"root of the datasets (default: {DATASETS_DIR})")
+    parser.add_argument('--models-dir', type=pathlib.Path, default=MODELS_DIR, help=f"root of the models (default: {MODELS_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # Pipeline stages
+    for command, (module, args, _) in COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=f"runs {module}")
+        for arg in args:
+            subparser.add_argument(arg, type=ARGS[arg][0], help=ARGS[arg][1])
+
+    # Startup benchmark
+    subparser = subparsers.add_parser('bench', help="measures the startup time of each subcommand")
+    subparser.add_argument('--repeat', type=int, default=5, help="number of runs of each subcommand (default: 5)")
+
+    return parser
+
+
+
+def measure_startup(code, repeat):
+    """Measures the time taken by a fresh interpreter to run some code.
+
+    Args:
+        code (str): python code to be run
+        repeat (int): number of runs
+
+    Returns:
+        float: median time in seconds, None if the code failed
+    """
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        r = subprocess.run([sys.executable, '-c', code], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+        if r.returncode != 0:
+            return None
+
+    return statistics.median(times)
+
+
+
+def bench(repeat):
+    """Prints the startup time (interpreter start and imports) of each subcommand.
+
+    Args:
+        repeat (int): number of runs of each subcommand
+    """
+
+    scripts_dir = str(pathlib.Path(__file__).resolve().parent)
+    baseline = measure_startup("pass", repeat)
+
+    print(f"{'command':<32}{'startup (ms)':>14}{'imports (ms)':>14}")
+    print(f"{'(bare interpreter)':<32}{1E3*baseline:>14.0f}{0:>14.0f}")
+    for command, (module, _, _) in {'(cli)': ('cli', [], False), **COMMANDS}.items():
+        t = measure_startup(f"import sys; sys.path.insert(0, {scripts_dir!r}); import {module}", repeat)
+        if t is None:
+            print(f"{command:<32}{'import error':>28}")
+        else:
+            print(f"{command:<32}{1E3*t:>14.0f}{1E3*(t-baseline):>14.0f}")
+
+
+
+#------------------------------#
+#--- MAIN ---------------------#
+#------------------------------#
+
+def main(argv=None):
+
+    args = get_parser().parse_args(argv)
+
+    if args.command == 'bench':
+        return bench(args.repeat)
+
+    # Imports and runs the stage
+    module, positionals, uses_models = COMMANDS[args.command]
+    kwargs = { arg: getattr(args, arg) for arg in positionals }
+    kwargs['datasets_dir'] = args.datasets_dir
+    if uses_models:
+        kwargs['models_dir'] = args.models_dir
+    importlib.import_module(module).main(**kwargs)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import os
+import pathlib
+
+import numpy as np
+
+
+
+#------------------------------#
+#--- ID INDEX -----------------#
+#------------------------------#
+
+class IdIndex:
+    """Persistent set of integer ids.
+
+    The ids are kept as a sorted int64 array stored in a .npy file, so membership
+    checks are binary searches over a compact array. Ids added since the last save
+    are kept in a python set and merged into the array when the index is saved.
+
+    Args:
+        path (str): .npy file where the index is stored, None for an in-memory index
+    """
+
+    def __init__(self, path=None):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.ids = np.load(self.path) if self.path is not None and self.path.exists() else np.empty(0, dtype=np.int64)
+        self.pending = set()
+
+    def __len__(self):
+        return self.ids.shape[0] + len(self.pending)
+
+    def __contains__(self, id):
+        return bool(self.contains([id])[0])
+
+    def contains(self, ids):
+        """Checks which ids are in the index.
+
+        Args:
+            ids (array-like): ids to be checked
+
+        Returns:
+            np.ndarray: boolean mask, True for the ids in the index
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        # Binary search over the saved ids
+        pos = np.searchsorted(self.ids, ids).clip(max=max(self.ids.shape[0]-1, 0))
+        mask = self.ids[pos] == ids if self.ids.shape[0] > 0 else np.zeros(ids.shape, dtype=bool)
+
+        # Lookup in the ids added since the last save
+        if self.pending:
+            mask |= np.fromiter((id in self.pending for id in ids.tolist()), dtype=bool, count=ids.shape[0])
+
+        return mask
+
+    def add(self, ids):
+        """Adds ids to the index.
+
+        Args:
+            ids (array-like): ids to be added
+
+        Returns:
+            np.ndarray: boolean mask, True for the ids that were not in the index
+                        (only the first occurrence of an id repeated in `ids` is True)
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        # Keeps the first occurrence of each id not yet in the index
+        mask = ~self.contains(ids)
+        _, first = np.unique(ids, return_index=True)
+        mask &= np.isin(np.arange(ids.shape[0]), first)
+
+        self.pending.update(ids[mask].tolist())
+
+        return mask
+
+    def clear(self):
+        """Removes all the ids from the index."""
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.pending = set()
+
+    def save(self):
+        """Merges the pending ids and stores the index (in-memory indexes are only merged)."""
+
+        if self.pending:
+            self.ids = np.union1d(self.ids, np.fromiter(self.pending, dtype=np.int64, count=len(self.pending)))
+            self.pending = set()
+
+        if self.path is None:
+            return None
+
+        # Writes to a temporary file first, so an interrupted save never corrupts the index
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, self.ids)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,9 @@
+import os
+import pathlib
+
+# Root of the project sources (the folder holding the scripts, datasets and models)
+ROOT_DIR = pathlib.Path(__file__).resolve().parents[2]
+
+# Default data roots, which can be overridden by environment variables or by the CLI options
+DATASETS_DIR = pathlib.Path(os.environ.get("DATASETS_DIR", ROOT_DIR / "datasets"))
+MODELS_DIR = pathlib.Path(os.environ.get("MODELS_DIR", ROOT_DIR / "models"))
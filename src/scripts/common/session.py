@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import pathlib
+import re
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+
+#------------------------------#
+#--- CACHED SESSION -----------#
+#------------------------------#
+
+class CachedSession(requests.Session):
+    """HTTP session that keeps GET responses in a persistent on-disk cache.
+
+    Each response is stored as a json metadata file plus a body file, keyed by the
+    hash of the requested url (headers such as API keys are never stored). A cached
+    response is served while it is younger than the TTL of the first pattern in
+    `ttls` matching its url. Once it expires, it is revalidated with If-None-Match
+    or If-Modified-Since when the server sent an ETag or a Last-Modified header,
+    and refetched otherwise.
+
+    Args:
+        cache_dir (str): directory where the responses are stored
+        ttls (list): (url regex, TTL in seconds) tuples, where a None TTL never expires
+        default_ttl (int): TTL of the urls not matching any pattern, 0 disables caching
+        cacheable (function): called with each new response, which is only stored if it returns True
+                              (default: every successful response is stored)
+    """
+
+    def __init__(self, cache_dir, ttls=(), default_ttl=0, cacheable=None):
+        super().__init__()
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default_ttl = default_ttl
+        self.cacheable = cacheable
+        self.stats = { 'hits': 0, 'misses': 0, 'revalidated': 0 }
+
+    def get_ttl(self, url):
+        """Obtains the TTL of a url.
+
+        Args:
+            url (str): full url, query string included
+
+        Returns:
+            int: TTL in seconds, None if the response never expires
+        """
+
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+
+        return self.default_ttl
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+
+        # Only GET requests are cached
+        if method.upper() != 'GET':
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        # Obtains the full url and its cache entry
+        url = requests.Request('GET', url, params=params).prepare().url
+        ttl = self.get_ttl(url)
+        if ttl == 0:
+            return super().request(method, url, headers=headers, **kwargs)
+        path = self.cache_dir / hashlib.sha256(url.encode()).hexdigest()
+        meta = self._read_meta(path)
+
+        # Serves the fresh cached response
+        if meta is not None and ( ttl is None or time.time() - meta['stored_at'] < ttl ):
+            self.stats['hits'] += 1
+            return self._read_response(path, meta)
+
+        # Revalidates the expired cached response when the server allows it
+        headers = dict(headers or {})
+        if meta is not None and 'ETag' in meta['headers']:
+            headers['If-None-Match'] = meta['headers']['ETag']
+        if meta is not None and 'Last-Modified' in meta['headers']:
+            headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        # Makes the HTTP request
+        r = super().request(method, url, headers=headers, **kwargs)
+
+        # Refreshes the cached response if it has not been modified
+        if r.status_code == 304 and meta is not None:
+            self.stats['revalidated'] += 1
+            meta['stored_at'] = time.time()
+            self._write(path.with_suffix('.json'), json.dumps({ **meta, 'headers': dict(meta['headers']) }).encode())
+            return self._read_response(path, meta)
+
+        # Stores the new response
+        self.stats['misses'] += 1
+        if r.status_code == 200 and ( self.cacheable is None or self.cacheable(r) ):
+            self._write(path.with_suffix('.body'), r.content)
+            self._write(path.with_suffix('.json'), json.dumps({
+                'url': url,
+                'status_code': r.status_code,
+                'reason': r.reason,
+                'encoding': r.encoding,
+                'headers': dict(r.headers),
+                'stored_at': time.time()
+            }).encode())
+
+        return r
+
+    def _read_meta(self, path):
+        if not path.with_suffix('.body').exists():
+            return None
+        try:
+            with open(path.with_suffix('.json')) as f:
+                meta = json.load(f)
+            meta['headers'] = CaseInsensitiveDict(meta['headers'])
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def _read_response(self, path, meta):
+        r = requests.Response()
+        with open(path.with_suffix('.body'), 'rb') as f:
+            r._content = f.read()
+        r.url = meta['url']
+        r.status_code = meta['status_code']
+        r.reason = meta['reason']
+        r.encoding = meta['encoding']
+        r.headers = CaseInsensitiveDict(meta['headers'])
+        return r
+
+    def _write(self, path, content):
+
+        # Writes to a temporary file first, so concurrent processes never read partial files
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
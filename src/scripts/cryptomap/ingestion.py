@@ -3,91 +3,145 @@ import pathlib
 import sys
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
-load_dotenv()
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
+from common.session import CachedSession
 
 
 
 #------------------------------#
-#--- BINANCE TRADABLE ---------#
+#--- AUXILIARY FUNCTIONS ------#
 #------------------------------#
 
-# Makes the HTTP request
-r = requests.get("https://api.binance.com/api/v3/exchangeInfo")
-r = r.json()
+def get_tradable_symbols(s):
+    """Obtains the symbols tradable against USDT on the Binance spot market.
 
-# Obtains tradable symbols
-df1 = pd.DataFrame(r['symbols'])
-df1 = df1[
-    (df1['isSpotTradingAllowed'] == True) & \
-    (df1['quoteAsset'] == 'USDT') & \
-    (df1['status'] == 'TRADING')
-]
-symbols = df1['symbol'].unique()
+    Args:
+        s (CachedSession): HTTP session
 
-# Deletes the dataframe from memory
-del df1
+    Returns:
+        np.ndarray: tradable symbols (e.g. BTCUSDT)
+    """
 
+    # Makes the HTTP request
+    r = s.get("https://api.binance.com/api/v3/exchangeInfo")
+    r = r.json()
 
+    # Obtains tradable symbols
+    df = pd.DataFrame(r['symbols'])
+    df = df[
+        (df['isSpotTradingAllowed'] == True) & \
+        (df['quoteAsset'] == 'USDT') & \
+        (df['status'] == 'TRADING')
+    ]
 
-#------------------------------#
-#--- COINMARKETCAP RANKING ----#
-#------------------------------#
+    return df['symbol'].unique()
+
+
+
+def get_top_ids(s, symbols, n=50):
+    """Obtains the CoinMarketCap ids of the top cryptos by market cap among the tradable symbols.
+
+    Args:
+        s (CachedSession): HTTP session
+        symbols (array-like): tradable symbols
+        n (int): number of cryptos to keep
+
+    Returns:
+        list: CoinMarketCap ids, ordered by rank
+    """
+
+    url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
+    headers = {
+        'Accepts': "application/json",
+        'X-CMC_PRO_API_KEY': os.environ.get("CMC_PRO_API_KEY")
+    }
+
+    # Makes the HTTP request
+    r = s.get(url, headers=headers)
+    r = r.json()
+
+    # Builds the dataframe with tradable crypto information
+    df = pd.DataFrame(r['data'])
+
+    # Filters symbols tradable on Binance
+    df['symbol'] = df['symbol'].apply(lambda x: f"{x}USDT")
+    df = df[df['symbol'].isin(symbols)]
+    df = df.sort_values('cmc_rank', ascending=True).drop_duplicates('symbol').reset_index(drop=True)
+
+    # Only keeps the ids of the top cryptos by market cap
+    return df.iloc[:n]['id'].astype(str).tolist()
 
-url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
-headers = {
-    'Accepts': "application/json", 
-    'X-CMC_PRO_API_KEY': os.environ.get("CMC_PRO_API_KEY")
-}
 
-# Makes the HTTP request
-r = requests.get(url, headers=headers)
-r = r.json()
 
-# Builds the dataframe with tradable crypto information
-df2 = pd.DataFrame(r['data'])
+def get_cryptomap(s, ids):
+    """Obtains the CoinMarketCap information of some cryptos.
 
-# Filters symbols tradable on Binance
-df2['symbol'] = df2['symbol'].apply(lambda x: f"{x}USDT")
-df2 = df2[df2['symbol'].isin(symbols)]
-df2 = df2.sort_values('cmc_rank', ascending=True).drop_duplicates('symbol').reset_index(drop=True)
+    Args:
+        s (CachedSession): HTTP session
+        ids (list): CoinMarketCap ids
 
-# Filters top 50 cryptos by market cap
-df2 = df2.iloc[:50]
+    Returns:
+        pd.DataFrame: crypto information, one row per crypto
+    """
 
-# Only keeps the ids of top 50 cryptos by marketcap
-ids = df2['id'].astype(str).tolist()
+    # Sets the HTTP request parameters
+    url = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/info"
+    headers = {
+        'Accepts': "application/json",
+        'X-CMC_PRO_API_KEY': os.environ.get("CMC_PRO_API_KEY")
+    }
+    params = {
+        'id': ','.join(ids)
+    }
+
+    # Makes the HTTP request
+    r = s.get(url, headers=headers, params=params)
+    r = r.json()
+
+    # Builds the dataframe with tradable crypto information
+    df = pd.DataFrame([d for d in r['data'].values()])
+
+    # Corrects naming inconsistency
+    df['base_asset'] = df['symbol']
+    df['symbol'] = df['symbol'].apply(lambda x: f"{x}USDT")
+
+    return df
 
 
 
 #------------------------------#
-#--- COINMARKETCAP INFO -------#
+#--- MAIN ---------------------#
 #------------------------------#
 
-# Sets the HTTP request parameters
-url = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/info"
-headers = {
-    'Accepts': "application/json", 
-    'X-CMC_PRO_API_KEY': os.environ.get("CMC_PRO_API_KEY")
-}
-params = {
-    'id': ','.join(ids)
-}
-
-# Makes the HTTP request
-r = requests.get(url, headers=headers, params=params)
-r = r.json()
-
-# Builds the dataframe with tradable crypto information
-df = pd.DataFrame([d for d in r['data'].values()])
-
-# Corrects naming inconsistency
-df['base_asset'] = df['symbol']
-df['symbol'] = df['symbol'].apply(lambda x: f"{x}USDT")
-
-# Saves the dataframe
-pathlib.Path("./../../datasets/raw").mkdir(parents=True, exist_ok=True)
-df.to_csv("./../../datasets/raw/cryptomap.csv")
+def main(datasets_dir=DATASETS_DIR):
+
+    datasets_dir = pathlib.Path(datasets_dir)
+    load_dotenv()
+
+    # Starts a session caching the reference data responses
+    s = CachedSession(datasets_dir / "cache/http", ttls=[
+        (r"api\.binance\.com/api/v3/exchangeInfo", 24*60*60),
+        (r"pro-api\.coinmarketcap\.com/v1/cryptocurrency/listings/latest", 24*60*60),
+        (r"pro-api\.coinmarketcap\.com/v2/cryptocurrency/info", 7*24*60*60)
+    ])
+
+    # Obtains the information of the top 50 cryptos tradable on Binance
+    symbols = get_tradable_symbols(s)
+    ids = get_top_ids(s, symbols)
+    df = get_cryptomap(s, ids)
+
+    # Saves the dataframe
+    (datasets_dir / "raw").mkdir(parents=True, exist_ok=True)
+    df.to_csv(datasets_dir / "raw/cryptomap.csv")
+
+    # Shows the cache usage
+    print(f"HTTP cache: {s.stats['hits']} hits, {s.stats['misses']} misses, {s.stats['revalidated']} revalidated")
+
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,29 @@
-import os
+import pathlib
 import sys
 
 import pandas as pd
 
-# Sets the current directory
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
 
 
 
-if __name__ == '__main__':
+#------------------------------#
+#--- MAIN ---------------------#
+#------------------------------#
+
+def main(datasets_dir=DATASETS_DIR):
+
+    datasets_dir = pathlib.Path(datasets_dir)
 
     # Reads the csv
-    df = pd.read_csv("./../../datasets/raw/cryptomap.csv")
+    df = pd.read_csv(datasets_dir / "raw/cryptomap.csv")
 
     # Keeps only useful columns
-    df = df[['id', 'symbol', 'base_asset', 'name', 'slug']]
\ No newline at end of file
+    df = df[['id', 'symbol', 'base_asset', 'name', 'slug']]
+
+
+
+if __name__ == '__main__':
+    main()
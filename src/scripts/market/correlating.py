@@ -0,0 +1,180 @@
+import pathlib
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
+
+# Correlation params (window, lags and step are in hours)
+PAIRS = [
+    ('er_bull_human', 'return'),
+    ('er_bear_human', 'return'),
+    ('er_bull_bot', 'return'),
+    ('er_bear_bot', 'return')
+]
+WINDOW = 30*24
+MIN_LAG = -24
+MAX_LAG = 24
+STEP = 24
+MIN_PERIODS = 48
+VAR_TOL = 1E-12
+
+
+
+#------------------------------#
+#--- AUXILIARY FUNCTIONS ------#
+#------------------------------#
+
+def shift(x, lag):
+    """Shifts an array along its first axis, so that shift(x, lag)[t] = x[t+lag].
+
+    Args:
+        x (np.ndarray): array to be shifted
+        lag (int): number of positions, positive lags look ahead
+
+    Returns:
+        np.ndarray: shifted array, filled with NaN where there is no value
+    """
+
+    out = np.full_like(x, np.nan)
+    if lag >= 0:
+        out[:x.shape[0]-lag] = x[lag:]
+    else:
+        out[-lag:] = x[:lag]
+
+    return out
+
+
+
+def rolling_sum(x, window, ends):
+    """Obtains the sums of x over the windows ending at each position in `ends`.
+
+    The running sum of x is computed once, so each window sum is the difference of
+    two of its values: sliding the window by one position costs O(1) per series,
+    whatever the window size.
+
+    Args:
+        x (np.ndarray): values to be summed, with time as the first axis
+        window (int): size of the windows
+        ends (np.ndarray): last position (inclusive) of each window
+
+    Returns:
+        np.ndarray: window sums, with shape (len(ends), *x.shape[1:])
+    """
+
+    running = np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(x, axis=0)])
+
+    return running[ends+1] - running[ends+1-window]
+
+
+
+def rolling_lagged_corr(x, y, window, lags, step=1, min_periods=None):
+    """Computes the rolling Pearson correlation between x[t] and y[t+lag] for several lags.
+
+    The rolling counts, sums, squares and cross-products of each pair of series are
+    obtained from running sums, so the cost does not depend on the window size. The
+    observations where either series is NaN are left out of the window.
+
+    Args:
+        x (np.ndarray): first series, with time as the first axis (e.g. time x asset x pair)
+        y (np.ndarray): second series, with the same shape as x
+        window (int): size of the rolling window
+        lags (list): offsets of y, positive lags mean that x leads y
+        step (int): distance between the ends of consecutive windows
+        min_periods (int): minimum number of observations in a window (default: window)
+
+    Returns:
+        np.ndarray: correlations, with shape (n_windows, *x.shape[1:], len(lags))
+        np.ndarray: last position (inclusive) of each window
+    """
+
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    min_periods = window if min_periods is None else min_periods
+    ends = np.arange(window-1, x.shape[0], step)
+
+    # Centers the series, which avoids losing precision in the running sums
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        x, y = x - np.nanmean(x, axis=0), y - np.nanmean(y, axis=0)
+
+    corr = np.full((ends.shape[0],) + x.shape[1:] + (len(lags),), np.nan, dtype=np.float32)
+    for i, lag in enumerate(lags):
+
+        # Only keeps the observations where both series have a value
+        y_lag = shift(y, lag)
+        mask = np.isfinite(x) & np.isfinite(y_lag)
+        x_masked, y_masked = np.where(mask, x, 0), np.where(mask, y_lag, 0)
+
+        # Obtains the window sums
+        n = rolling_sum(mask.astype(np.float64), window, ends)
+        sx, sy = rolling_sum(x_masked, window, ends), rolling_sum(y_masked, window, ends)
+        sxx, syy = rolling_sum(x_masked**2, window, ends), rolling_sum(y_masked**2, window, ends)
+        sxy = rolling_sum(x_masked*y_masked, window, ends)
+
+        # Computes the correlation (the variances are compared to the sums of squares, since the
+        # cancellation of the running sums leaves a tiny positive variance over constant windows)
+        cov, var_x, var_y = n*sxy - sx*sy, n*sxx - sx**2, n*syy - sy**2
+        valid = (n >= min_periods) & (var_x > VAR_TOL*n*sxx) & (var_y > VAR_TOL*n*syy)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr[..., i] = np.where(valid, np.clip(cov / np.sqrt(var_x*var_y), -1, 1), np.nan)
+
+    return corr, ends
+
+
+
+#------------------------------#
+#--- MAIN ---------------------#
+#------------------------------#
+
+def main(window=WINDOW, min_lag=MIN_LAG, max_lag=MAX_LAG, datasets_dir=DATASETS_DIR):
+
+    datasets_dir = pathlib.Path(datasets_dir)
+
+    # Reads the datasets
+    df_er = pd.read_csv(datasets_dir / "engagement_rate.csv.gz", index_col=0, header=[0, 1])
+    df_er.index = pd.to_datetime(df_er.index)
+    df_ohlcv = pd.read_csv(datasets_dir / "processed/ohlcv.csv.gz", index_col=0, parse_dates=['date'], low_memory=False)
+
+    # Obtains the prices of each asset
+    df_price = df_ohlcv.pivot_table(index='date', columns='base_asset', values='price')
+
+    # Aligns the engagement rates and the prices on a regular hourly grid
+    assets = sorted(set(df_er.columns.get_level_values(0)) & set(df_price.columns))
+    dates = pd.date_range(min(df_er.index.min(), df_price.index.min()), max(df_er.index.max(), df_price.index.max()), freq='h')
+
+    # Obtains the hourly returns once the prices are on the grid, so a missing hour never yields a multi-hour return
+    series = { 'return': df_price.reindex(index=dates, columns=assets).pct_change(fill_method=None).to_numpy() }
+    for col in { col for pair in PAIRS for col in pair } - { 'return' }:
+        series[col] = df_er.xs(col, axis=1, level=1).reindex(index=dates, columns=assets).to_numpy()
+
+    # Builds the (time x asset x pair) arrays of each side of the pairs
+    x = np.stack([series[col_x] for col_x, _ in PAIRS], axis=-1)
+    y = np.stack([series[col_y] for _, col_y in PAIRS], axis=-1)
+
+    # Computes the rolling correlations (time x asset x pair x lag), windows shorter than MIN_PERIODS only need to be full
+    lags = np.arange(min_lag, max_lag+1)
+    corr, ends = rolling_lagged_corr(x, y, window, lags, step=STEP, min_periods=min(MIN_PERIODS, window))
+
+    # Saves the correlations
+    (datasets_dir / "market").mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        datasets_dir / "market/rolling_corr.npz",
+        corr=corr,
+        dates=dates[ends].to_numpy().astype('datetime64[s]'),
+        assets=np.array(assets),
+        pairs=np.array(PAIRS),
+        lags=lags,
+        window=window
+    )
+
+
+
+if __name__ == '__main__':
+
+    # Gets the arguments of the script
+    _, WINDOW, MIN_LAG, MAX_LAG = tuple(sys.argv)
+    main(int(WINDOW), int(MIN_LAG), int(MAX_LAG))
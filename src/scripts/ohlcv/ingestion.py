@@ -7,11 +7,15 @@ import time
 from datetime import datetime
 
 import pandas as pd
-import requests
 from IPython.display import display
 
-# Sets the current directory
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
+from common.session import CachedSession
+
+# HTTP cache params (klines pages are historical data, so they are kept for long, but only once all their candles closed)
+CACHE_TTLS = [(r"api\.binance\.com/api/v3/klines", 30*24*60*60)]
 
 
 
@@ -24,6 +28,7 @@ def print_summary(df_summary, base_assets, start):
     # Global summary
     df_global_summary = pd.DataFrame([{
         'n_rows': df_summary['n_rows'].sum(),
+        'n_cache_hits': df_summary['cache_hits'].sum(),
         'enlapsed_time': str(datetime.now()-start),
         'n_finished': df_summary[df_summary['status'] == 'done'].shape[0],
         'n_skipped': df_summary[df_summary['status'] == 'skipped'].shape[0],
@@ -43,12 +48,34 @@ def print_summary(df_summary, base_assets, start):
 
 
 
-def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt):
+def is_closed_page(r):
+    """Checks whether all the candles of a klines page had already closed when it was fetched.
+
+    The last page of a run ends with the candle still open, whose price, volume and
+    number of trades are partial, so it must not be served from the cache later on.
+
+    Args:
+        r (requests.Response): klines response
+
+    Returns:
+        bool: True if the page can be cached
+    """
+
+    klines = r.json()
+
+    return isinstance(klines, list) and len(klines) > 0 and klines[-1][6] < time.time()*1E3
+
+
+
+def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt, datasets_dir):
 
     if safe_interrupt.is_set():
-        status.put({ 'base_asset': base_asset, 'n_rows': 0, 'status': 'skipped', 'iterations': 0 })
+        status.put({ 'base_asset': base_asset, 'n_rows': 0, 'status': 'skipped', 'iterations': 0, 'cache_hits': 0 })
         return None
 
+    # Starts a session
+    s = CachedSession(datasets_dir / "cache/http", ttls=CACHE_TTLS, cacheable=is_closed_page)
+
     # Sets the HTTP request params
     url = "https://api.binance.com/api/v3/klines"
     params = {
@@ -58,7 +85,7 @@ def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt):
     }
 
     try:
-        df = pd.read_csv(f"./../../datasets/raw/tmp/ohlcv/{base_asset}.csv", index_col=0, parse_dates=['date'])
+        df = pd.read_csv(datasets_dir / f"raw/tmp/ohlcv/{base_asset}.csv", index_col=0, parse_dates=['date'])
         params['startTime'] = int(df['date'].max().timestamp()*1E3)
     except Exception as e:
         df = pd.DataFrame()
@@ -69,7 +96,7 @@ def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt):
         while params['startTime'] < int(end_date.timestamp()*1E3):
 
             # Makes the request
-            r = requests.get(url, params=params)
+            r = s.get(url, params=params)
             r = r.json()
 
             df_tmp = pd.DataFrame(r, columns=['date', '', '', '', 'price', 'vol', '', '', 'n_trades', '', '', ''])
@@ -85,7 +112,7 @@ def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt):
             df = pd.concat([df, df_tmp], ignore_index=True)
 
             # Updates status
-            status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "running" })
+            status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "running", 'cache_hits': s.stats['hits'] })
 
             # Updates request params
             params['startTime'] = int(df['date'].max().timestamp() * 1E3 + 1)
@@ -93,30 +120,30 @@ def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt):
     except KeyboardInterrupt:
         
         # Updates status
-        status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "saving" })
+        status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "saving", 'cache_hits': s.stats['hits'] })
         
         # Saves the collected ohlcv
-        pathlib.Path("./../../datasets/raw/tmp/ohlcv").mkdir(parents=True, exist_ok=True)
-        df.to_csv(f"./../../datasets/raw/tmp/ohlcv/{base_asset}.csv")
+        (datasets_dir / "raw/tmp/ohlcv").mkdir(parents=True, exist_ok=True)
+        df.to_csv(datasets_dir / f"raw/tmp/ohlcv/{base_asset}.csv")
 
         # Updates status
-        status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "saved" })
+        status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "saved", 'cache_hits': s.stats['hits'] })
 
         return None
 
     except:
-        status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "error" })
+        status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "error", 'cache_hits': s.stats['hits'] })
         return None
 
     # Gets only ohlcv data from between start_date and end_date
     df = df[(start_date <= df['date']) & (df['date'] < end_date)]
 
     # Saves the collected twits
-    pathlib.Path("./../../datasets/raw/tmp/ohlcv").mkdir(parents=True, exist_ok=True)
-    df.to_csv(f"./../../datasets/raw/tmp/ohlcv/{base_asset}.csv")
+    (datasets_dir / "raw/tmp/ohlcv").mkdir(parents=True, exist_ok=True)
+    df.to_csv(datasets_dir / f"raw/tmp/ohlcv/{base_asset}.csv")
 
     # Updates status
-    status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "done" })
+    status.put({ 'base_asset': base_asset, 'n_rows': df.shape[0], 'status': "done", 'cache_hits': s.stats['hits'] })
     
     return None
 
@@ -126,26 +153,23 @@ def get_ohlcv(base_asset, start_date, end_date, status, safe_interrupt):
 #--- MAIN ---------------------#
 #------------------------------#
 
-if __name__ == '__main__':
+def main(start_date, end_date, datasets_dir=DATASETS_DIR):
 
-    # Gets the arguments of the script
-    _, START_DATE, END_DATE = tuple(sys.argv)
-    START_DATE = datetime.fromisoformat(START_DATE)
-    END_DATE = datetime.fromisoformat(END_DATE)
+    datasets_dir = pathlib.Path(datasets_dir)
 
     # Obtains the base assets
-    df_cryptomap = pd.read_csv("./../../datasets/raw/cryptomap.csv", index_col=0)
+    df_cryptomap = pd.read_csv(datasets_dir / "raw/cryptomap.csv", index_col=0)
     base_assets = df_cryptomap['base_asset'].tolist()
 
     # Initializes the progress indicator variables
-    df_summary = pd.DataFrame(columns=['base_asset', 'n_rows', 'status'])
+    df_summary = pd.DataFrame(columns=['base_asset', 'n_rows', 'status', 'cache_hits'])
     safe_interrupt = mp.Manager().Event()
     status = mp.Manager().Queue()
     start = datetime.now()
 
     # Starts the pool to multiprocess the collection
     pool = mp.Pool(processes=mp.cpu_count(), maxtasksperchild=1)
-    dfs_ohlcv = pool.starmap_async(get_ohlcv, [(base_asset, START_DATE, END_DATE, status, safe_interrupt) for base_asset in base_assets])
+    dfs_ohlcv = pool.starmap_async(get_ohlcv, [(base_asset, start_date, end_date, status, safe_interrupt, datasets_dir) for base_asset in base_assets])
 
     try:
         while not dfs_ohlcv.ready():
@@ -170,9 +194,17 @@ if __name__ == '__main__':
     pool.terminate()
     
     # Concatenates all temporary files and saves the result
-    df_ohlcv, tmp_filenames = pd.DataFrame(), glob.glob("./../../datasets/raw/tmp/ohlcv/*.csv")
+    df_ohlcv, tmp_filenames = pd.DataFrame(), glob.glob(str(datasets_dir / "raw/tmp/ohlcv/*.csv"))
     for tmp_filename in tmp_filenames:
         df_tmp = pd.read_csv(tmp_filename, index_col=0)
         df_tmp['base_asset'] = pathlib.Path(tmp_filename).stem
         df_ohlcv = pd.concat([df_ohlcv, df_tmp], ignore_index=True)
-    df_ohlcv.to_csv("./../../datasets/raw/ohlcv.csv")
\ No newline at end of file
+    df_ohlcv.to_csv(datasets_dir / "raw/ohlcv.csv")
+
+
+
+if __name__ == '__main__':
+
+    # Gets the arguments of the script
+    _, START_DATE, END_DATE = tuple(sys.argv)
+    main(datetime.fromisoformat(START_DATE), datetime.fromisoformat(END_DATE))
@@ -1,12 +1,12 @@
-import os
 import pathlib
 import sys
 from datetime import datetime
 
 import pandas as pd
 
-# Sets the current directory
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
 
 
 
@@ -14,22 +14,27 @@ os.chdir(sys.path[0])
 #--- MAIN ---------------------#
 #------------------------------#
 
-if __name__ == '__main__':
+def main(start_date, end_date, datasets_dir=DATASETS_DIR):
 
-    # Gets the arguments of the script
-    _, START_DATE, END_DATE = tuple(sys.argv)
-    START_DATE = datetime.fromisoformat(START_DATE)
-    END_DATE = datetime.fromisoformat(END_DATE)
+    datasets_dir = pathlib.Path(datasets_dir)
 
     # Reads the dataset
-    df = pd.read_csv("./../../datasets/raw/ohlcv.csv.gz", index_col=0, parse_dates=['date'], low_memory=False)
-    df_cryptomap = pd.read_csv("./../../datasets/raw/cryptomap.csv.gz", index_col=0)
+    df = pd.read_csv(datasets_dir / "raw/ohlcv.csv.gz", index_col=0, parse_dates=['date'], low_memory=False)
+    df_cryptomap = pd.read_csv(datasets_dir / "raw/cryptomap.csv.gz", index_col=0)
 
     # Performs basic operations
-    df = df[(df['date'] >= START_DATE) & (df['date'] < END_DATE)]
+    df = df[(df['date'] >= start_date) & (df['date'] < end_date)]
     df = df[df['base_asset'].isin(df_cryptomap['base_asset'])]
     df.drop_duplicates(ignore_index=True, inplace=True)
 
     # Saves the ohlcv dataframe
-    pathlib.Path("./../../datasets/processed").mkdir(parents=True, exist_ok=True)
-    df.to_csv("./../../datasets/processed/ohlcv.csv.gz")
\ No newline at end of file
+    (datasets_dir / "processed").mkdir(parents=True, exist_ok=True)
+    df.to_csv(datasets_dir / "processed/ohlcv.csv.gz")
+
+
+
+if __name__ == '__main__':
+
+    # Gets the arguments of the script
+    _, START_DATE, END_DATE = tuple(sys.argv)
+    main(datetime.fromisoformat(START_DATE), datetime.fromisoformat(END_DATE))
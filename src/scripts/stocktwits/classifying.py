@@ -1,4 +1,3 @@
-import os
 import pathlib
 import sys
 
@@ -7,20 +6,21 @@ import tensorflow as tf
 import tensorflow_hub as hub
 import tensorflow_text as text
 
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR, MODELS_DIR
 
 
-# Sets the current directory
-os.chdir(sys.path[0])
 
+def main(datasets_dir=DATASETS_DIR, models_dir=MODELS_DIR):
 
-
-if __name__ == "__main__":
+    datasets_dir, models_dir = pathlib.Path(datasets_dir), pathlib.Path(models_dir)
 
     # Loads the datasets
-    df = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=1000000)#, skiprows=range(1, 20+1))
+    df = pd.read_csv(datasets_dir / "enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=1000000)#, skiprows=range(1, 20+1))
 
     # Loads the classifier model
-    model = tf.keras.models.load_model("./../../models/bert")
+    model = tf.keras.models.load_model(str(models_dir / "bert"))
 
     # Makes predictions for all samples
     df['label_pred_score'] = pd.Series(model.predict(df['text'].tolist(), use_multiprocessing=True).flatten(), index=df.index)
@@ -28,7 +28,7 @@ if __name__ == "__main__":
     # df = df[['id', 'label_pred_score', 'label_pred']]
 
     #
-    df_twits = pd.read_csv("./../../datasets/classified/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False)
+    df_twits = pd.read_csv(datasets_dir / "classified/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False)
     if not 'label_pred_score' in df_twits.columns:
         df_twits['label_pred_score'] = pd.NA
     if not 'label_pred' in df_twits.columns:
@@ -39,5 +39,10 @@ if __name__ == "__main__":
     df_twits = df_twits.filter(regex='^(?!.*_DROP)')
 
     # Saves the twits dataframe
-    pathlib.Path("./../../datasets/classified").mkdir(parents=True, exist_ok=True)
-    df_twits.to_csv("./../../datasets/classified/twits.csv.gz")
\ No newline at end of file
+    (datasets_dir / "classified").mkdir(parents=True, exist_ok=True)
+    df_twits.to_csv(datasets_dir / "classified/twits.csv.gz")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-import math
-import os
 import pathlib
 import sys
 
@@ -8,31 +6,24 @@ import tensorflow as tf
 import tensorflow_hub as hub
 import tensorflow_text as text
 
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR, MODELS_DIR
 
 
-# Sets the current directory
-os.chdir(sys.path[0])
 
+def main(chunk, nrows=1000000, datasets_dir=DATASETS_DIR, models_dir=MODELS_DIR):
 
-
-if __name__ == "__main__":
+    datasets_dir, models_dir = pathlib.Path(datasets_dir), pathlib.Path(models_dir)
 
     print("READING CSV")
 
-    # Loads the datasets
-    nrows = 1000000
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=None)
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, nrows+1))
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, 2*nrows+1))
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, 3*nrows+1))
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, 4*nrows+1))
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, 5*nrows+1))
-    # df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, 6*nrows+1))
-    df_twits = pd.read_csv("./../../datasets/enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, 7*nrows+1))
+    # Loads the chunk of the dataset
+    df_twits = pd.read_csv(datasets_dir / "enhanced/twits.csv.gz", index_col=0, parse_dates=['date'], low_memory=False, nrows=nrows, skiprows=range(1, chunk*nrows+1))
 
     # Loads the classifier model
     print("LOADING MODEL")
-    model = tf.keras.models.load_model("./../../models/bert")
+    model = tf.keras.models.load_model(str(models_dir / "bert"))
 
     # Makes predictions for all samples
     df_twits['label_pred_score'] = pd.Series(model.predict(df_twits['text'].tolist()).flatten(), index=df_twits.index)
@@ -40,5 +31,13 @@ if __name__ == "__main__":
 
     # Saves the twits dataframe
     print("SAVING MODEL")
-    pathlib.Path("./../../datasets/classified/tmp").mkdir(parents=True, exist_ok=True)
-    df_twits.to_csv("./../../datasets/classified/tmp/twits_7.csv.gz")
\ No newline at end of file
+    (datasets_dir / "classified/tmp").mkdir(parents=True, exist_ok=True)
+    df_twits.to_csv(datasets_dir / f"classified/tmp/twits_{chunk}.csv.gz")
+
+
+
+if __name__ == "__main__":
+
+    # Gets the arguments of the script
+    _, CHUNK = tuple(sys.argv)
+    main(int(CHUNK))
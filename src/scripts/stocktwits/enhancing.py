@@ -1,4 +1,3 @@
-import os
 import pathlib
 import re
 import string
@@ -9,14 +8,29 @@ import contractions
 import emoji
 import nltk
 import pandas as pd
-from wordcloud import STOPWORDS
 
-# Sets the current directory
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
 
-# Orders the stopwords
-STOPWORDS = list(STOPWORDS)
-STOPWORDS.sort(key=len, reverse=True)
+# Stopwords (the list of wordcloud.STOPWORDS), ordered by length so the longest are removed first
+STOPWORDS = sorted('''
+    a about above after again against all also am an and any are aren't as at be because been
+    before being below between both but by can can't cannot com could couldn't did didn't do does
+    doesn't doing don't down during each else ever few for from further get had hadn't has hasn't
+    have haven't having he he'd he'll he's hence her here here's hers herself him himself his how
+    how's however http i i'd i'll i'm i've if in into is isn't it it's its itself just k let's like
+    me more most mustn't my myself no nor not of off on once only or other otherwise ought our ours
+    ourselves out over own r same shall shan't she she'd she'll she's should shouldn't since so
+    some such than that that's the their theirs them themselves then there there's therefore these
+    they they'd they'll they're they've this those through to too under until up very was wasn't we
+    we'd we'll we're we've were weren't what what's when when's where where's which while who who's
+    whom why why's with won't would wouldn't www you you'd you'll you're you've your yours yourself
+    yourselves
+'''.split(), key=len, reverse=True)
+
+# Tweet tokenizer shared by all the twits
+TOKENIZER = nltk.TweetTokenizer()
 
 
 
@@ -48,8 +62,7 @@ def light_clean_text(text):
     text = re.sub(r"[A-Za-z0-9]+://[A-Za-z0-9%-_]+(/[A-Za-z0-9%-_])*(#|\\?)[A-Za-z0-9%-_&=]*", " httpurl ", text)
 
     # Applies tweet tokenizer
-    tk = nltk.TweetTokenizer()
-    text = tk.tokenize(text)
+    text = TOKENIZER.tokenize(text)
 
     # Merges the result
     text = " ".join(text)
@@ -96,8 +109,7 @@ def heavy_clean_text(text):
     text = text.translate(str.maketrans('', '', string.punctuation))
 
     # Applies tweet tokenizer
-    tk = nltk.TweetTokenizer()
-    text = tk.tokenize(text)
+    text = TOKENIZER.tokenize(text)
 
     # Merges the result
     text = " ".join(text)
@@ -110,20 +122,17 @@ def heavy_clean_text(text):
 #--- MAIN ---------------------#
 #------------------------------#
 
-if __name__ == "__main__":
+def main(start_date, end_date, datasets_dir=DATASETS_DIR):
 
-    # Gets the arguments of the script
-    _, START_DATE, END_DATE = tuple(sys.argv)
-    START_DATE = datetime.fromisoformat(START_DATE)
-    END_DATE = datetime.fromisoformat(END_DATE)
+    datasets_dir = pathlib.Path(datasets_dir)
 
     # Loads the datasets
-    df_twits = pd.read_csv("./../../datasets/processed/twits.csv.gz", index_col=0, parse_dates=['date'])
-    df_users = pd.read_csv("./../../datasets/processed/users.csv.gz", index_col=0, parse_dates=['join_date'])
+    df_twits = pd.read_csv(datasets_dir / "processed/twits.csv.gz", index_col=0, parse_dates=['date'])
+    df_users = pd.read_csv(datasets_dir / "processed/users.csv.gz", index_col=0, parse_dates=['join_date'])
 
     # Adds information to the user dataframe
-    df_users['n_active_days'] = df_users['join_date'].apply(lambda x: ( END_DATE - x ).days )
-    df_users['n_active_days_clipped'] = df_users['join_date'].apply(lambda x: ( END_DATE - max(START_DATE, x) ).days )
+    df_users['n_active_days'] = df_users['join_date'].apply(lambda x: ( end_date - x ).days )
+    df_users['n_active_days_clipped'] = df_users['join_date'].apply(lambda x: ( end_date - max(start_date, x) ).days )
     df_users['twit_freq'] = df_users['n_twits']/df_users['n_active_days_clipped']
     df_users['idea_freq'] = df_users['n_twits']/df_users['n_active_days']
     df_users['is_bot'] = ( df_users['twit_freq'] > df_users['twit_freq'].quantile(0.9) ) | \
@@ -137,9 +146,17 @@ if __name__ == "__main__":
     df_twits['text_heavy_clean'] = df_twits['text_light_clean'].apply(heavy_clean_text)
 
     # Saves the users dataframe
-    pathlib.Path("./../../datasets/enhanced").mkdir(parents=True, exist_ok=True)
-    df_users.to_csv("./../../datasets/enhanced/users.csv.gz")
+    (datasets_dir / "enhanced").mkdir(parents=True, exist_ok=True)
+    df_users.to_csv(datasets_dir / "enhanced/users.csv.gz")
 
     # Saves the twits dataframe
-    pathlib.Path("./../../datasets/enhanced").mkdir(parents=True, exist_ok=True)
-    df_twits.to_csv("./../../datasets/enhanced/twits.csv.gz")
\ No newline at end of file
+    (datasets_dir / "enhanced").mkdir(parents=True, exist_ok=True)
+    df_twits.to_csv(datasets_dir / "enhanced/twits.csv.gz")
+
+
+
+if __name__ == "__main__":
+
+    # Gets the arguments of the script
+    _, START_DATE, END_DATE = tuple(sys.argv)
+    main(datetime.fromisoformat(START_DATE), datetime.fromisoformat(END_DATE))
@@ -0,0 +1,94 @@
+import collections
+import itertools
+import multiprocessing as mp
+import pathlib
+import sys
+
+import pandas as pd
+
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
+
+# Indexing params
+KEYS = ['label', 'user.type', 'base_asset']
+CHUNK_SIZE = 100000
+MAX_NGRAM = 2
+MAX_NGRAM_ENTRIES = 1000000
+
+
+
+#------------------------------#
+#--- AUXILIARY FUNCTIONS ------#
+#------------------------------#
+
+def count_ngrams(df):
+    """Counts the tokens and n-grams of a chunk of twits for each group of keys.
+
+    Args:
+        df (pd.DataFrame): chunk of the enhanced twits dataframe
+
+    Returns:
+        collections.Counter: token counts indexed by (label, user type, base asset, 1, token)
+        collections.Counter: n-gram counts (n > 1) indexed by (label, user type, base asset, n, ngram)
+    """
+
+    token_counts, ngram_counts = collections.Counter(), collections.Counter()
+
+    # Uses a placeholder for missing keys so they still form their own group
+    df = df.dropna(subset=['text_heavy_clean']).fillna({ key: '' for key in KEYS })
+
+    for keys, texts in df.groupby(KEYS)['text_heavy_clean']:
+        for text in texts:
+
+            # Tokenizes the heavy cleaned text (already split by the tweet tokenizer)
+            tokens = str(text).split()
+
+            # Counts every token and n-gram of the twit
+            token_counts.update((*keys, 1, token) for token in tokens)
+            for n in range(2, MAX_NGRAM+1):
+                ngram_counts.update((*keys, n, " ".join(ngram)) for ngram in zip(*[tokens[i:] for i in range(n)]))
+
+    return token_counts, ngram_counts
+
+
+
+#------------------------------#
+#--- MAIN ---------------------#
+#------------------------------#
+
+def main(datasets_dir=DATASETS_DIR):
+
+    datasets_dir = pathlib.Path(datasets_dir)
+
+    # Reads the twits dataset in chunks, so the raw text is never fully loaded
+    # (only the empty cells are missing, so texts such as 'nan' or 'null' are kept)
+    chunks = pd.read_csv(datasets_dir / "enhanced/twits.csv.gz", usecols=KEYS+['text_heavy_clean'], chunksize=CHUNK_SIZE, keep_default_na=False, na_values={ col: [''] for col in KEYS+['text_heavy_clean'] })
+
+    # Counts the n-grams of each chunk in parallel and merges the results (one chunk per process at a time)
+    token_counts, ngram_counts = collections.Counter(), collections.Counter()
+    with mp.Pool(processes=mp.cpu_count()) as pool:
+        while batch := list(itertools.islice(chunks, mp.cpu_count())):
+            for chunk_token_counts, chunk_ngram_counts in pool.imap_unordered(count_ngrams, batch):
+                token_counts.update(chunk_token_counts)
+                ngram_counts.update(chunk_ngram_counts)
+
+            # Only keeps the most frequent n-grams once there are too many of them, which bounds the memory used
+            # (the token counts are never pruned, so they stay exact once summed over any of the keys)
+            if len(ngram_counts) > 2*MAX_NGRAM_ENTRIES:
+                ngram_counts = collections.Counter(dict(ngram_counts.most_common(MAX_NGRAM_ENTRIES)))
+
+    # Builds the frequency index dataframe
+    counts = itertools.chain(token_counts.items(), ngram_counts.items())
+    df_freqs = pd.DataFrame([(*key, count) for key, count in counts], columns=KEYS+['n', 'ngram', 'count'])
+    df_freqs[KEYS] = df_freqs[KEYS].replace('', pd.NA)
+    df_freqs = df_freqs.sort_values(KEYS+['n', 'count'], ascending=[True, True, True, True, False], ignore_index=True)
+
+    # Saves the frequency index dataframe
+    (datasets_dir / "enhanced").mkdir(parents=True, exist_ok=True)
+    df_freqs.to_csv(datasets_dir / "enhanced/word_freqs.csv.gz")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,19 @@ from datetime import datetime
 
 import pandas as pd
 from IPython.display import display
-from requests import Session
 
-# Sets the current directory
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.ids import IdIndex
+from common.paths import DATASETS_DIR
+from common.session import CachedSession
+
+# HTTP cache params (only the pages behind a cursor are cached, the first page is always refetched)
+# The cache is keyed by the `max` cursor, which is the id of the last twit of the previous page, so
+# it only pays off when the same cursors are requested again: resumed runs (which restart from the
+# oldest stored twit) or re-runs of a stream without new twits. Any new twit on the first page shifts
+# every later cursor, so a fresh run over an active stream gets no hits
+CACHE_TTLS = [(r"api\.stocktwits\.com/api/2/streams/symbol/.*[?&]max=", 30*24*60*60)]
 
 
 
@@ -24,6 +33,7 @@ def print_summary(df_summary, base_assets, start):
     # Global summary
     df_global_summary = pd.DataFrame([{
         'n_twits': df_summary['n_twits'].sum(),
+        'n_cache_hits': df_summary['cache_hits'].sum(),
         'enlapsed_time': str(datetime.now()-start),
         'n_finished': df_summary[df_summary['status'] == 'done'].shape[0],
         'n_skipped': df_summary[df_summary['status'] == 'skipped'].shape[0],
@@ -43,14 +53,14 @@ def print_summary(df_summary, base_assets, start):
 
 
 
-def get_twits(base_asset, status, safe_interrupt):
+def get_twits(base_asset, status, safe_interrupt, datasets_dir):
 
     if safe_interrupt.is_set():
-        status.put({ 'base_asset': base_asset, 'n_twits': 0, 'status': 'skipped', 'iterations': 0 })
+        status.put({ 'base_asset': base_asset, 'n_twits': 0, 'status': 'skipped', 'iterations': 0, 'cache_hits': 0 })
         return None
 
     # Starts a session
-    s = Session()
+    s = CachedSession(datasets_dir / "cache/http", ttls=CACHE_TTLS)
 
     # Sets the HTTP request params
     url = f"https://api.stocktwits.com/api/2/streams/symbol/{base_asset}.X.json"
@@ -59,11 +69,20 @@ def get_twits(base_asset, status, safe_interrupt):
         'filter': 'top'
     }
 
+    # Index of the ids of the twits already stored
+    index = IdIndex(datasets_dir / f"raw/tmp/stocktwits/ids/{base_asset}.npy")
+
+    # Only rebuilds the index from the twits loaded when it does not describe the stored csv
+    # (e.g. the index was saved along a finished .csv but a stale .csv.gz is resumed)
     try:
-        df_twits = pd.read_csv(f"./../../datasets/raw/tmp/stocktwits/{base_asset}.csv.gz", index_col=0, low_memory=False)
+        df_twits = pd.read_csv(datasets_dir / f"raw/tmp/stocktwits/{base_asset}.csv.gz", index_col=0, low_memory=False)
         params['max'] = df_twits.iloc[-1]['id']
+        if len(index) != df_twits.shape[0] or not index.contains(df_twits['id'].agg(['min', 'max'])).all():
+            index.clear()
+            index.add(df_twits['id'])
     except:
         df_twits = pd.DataFrame()
+        index.clear()
     
     try:
 
@@ -76,26 +95,35 @@ def get_twits(base_asset, status, safe_interrupt):
 
             # Extracts twits
             df_tmp = pd.DataFrame(r['messages'])
+
+            # Drops the twits already stored
+            if df_tmp.shape[0] > 0:
+                df_tmp = df_tmp[~index.contains(df_tmp['id'])].drop_duplicates('id')
             df_twits = pd.concat([df_twits, df_tmp], ignore_index=True)
 
+            # Marks the twits as stored only once they are part of the dataframe
+            if df_tmp.shape[0] > 0:
+                index.add(df_tmp['id'])
+
             # Updates the HTTP request params
             params['max'] = r['cursor']['max']
 
             # Updates status
             i += 1
-            status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "running", 'iterations': i, 'min_date': df_twits['created_at'].min() })
+            status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "running", 'iterations': i, 'min_date': df_twits['created_at'].min(), 'cache_hits': s.stats['hits'] })
         
     except KeyboardInterrupt:
 
         # Updates status
-        status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "saving", 'iterations': i, 'min_date': df_twits['created_at'].min() })
+        status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "saving", 'iterations': i, 'min_date': df_twits['created_at'].min(), 'cache_hits': s.stats['hits'] })
         
         # Saves the collected twits
-        pathlib.Path("./../../datasets/raw/tmp/stocktwits").mkdir(parents=True, exist_ok=True)
-        df_twits.to_csv(f"./../../datasets/raw/tmp/stocktwits/{base_asset}.csv.gz")
+        (datasets_dir / "raw/tmp/stocktwits").mkdir(parents=True, exist_ok=True)
+        df_twits.to_csv(datasets_dir / f"raw/tmp/stocktwits/{base_asset}.csv.gz")
+        index.save()
 
         # Updates status
-        status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "saved", 'iterations': i, 'min_date': df_twits['created_at'].min() })
+        status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "saved", 'iterations': i, 'min_date': df_twits['created_at'].min(), 'cache_hits': s.stats['hits'] })
 
         return None
 
@@ -103,18 +131,20 @@ def get_twits(base_asset, status, safe_interrupt):
 
         # Saves the collected twits
         if df_twits.shape[0] > 0:
-            pathlib.Path("./../../datasets/raw/tmp/stocktwits").mkdir(parents=True, exist_ok=True)
-            df_twits.to_csv(f"./../../datasets/raw/tmp/stocktwits/{base_asset}.csv.gz")
+            (datasets_dir / "raw/tmp/stocktwits").mkdir(parents=True, exist_ok=True)
+            df_twits.to_csv(datasets_dir / f"raw/tmp/stocktwits/{base_asset}.csv.gz")
+            index.save()
 
-        status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "error", 'iterations': i, 'min_date': df_twits['created_at'].min() })
+        status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "error", 'iterations': i, 'min_date': df_twits['created_at'].min(), 'cache_hits': s.stats['hits'] })
         return None
 
     # Saves the collected twits
-    pathlib.Path("./../../datasets/raw/tmp/stocktwits").mkdir(parents=True, exist_ok=True)
-    df_twits.to_csv(f"./../../datasets/raw/tmp/stocktwits/{base_asset}.csv")
+    (datasets_dir / "raw/tmp/stocktwits").mkdir(parents=True, exist_ok=True)
+    df_twits.to_csv(datasets_dir / f"raw/tmp/stocktwits/{base_asset}.csv")
+    index.save()
 
     # Updates status
-    status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "done", 'iterations': i, 'min_date': df_twits['created_at'].min() })
+    status.put({ 'base_asset': base_asset, 'n_twits': df_twits.shape[0], 'status': "done", 'iterations': i, 'min_date': df_twits['created_at'].min(), 'cache_hits': s.stats['hits'] })
 
     return None
 
@@ -124,21 +154,23 @@ def get_twits(base_asset, status, safe_interrupt):
 #--- MAIN ---------------------#
 #------------------------------#
 
-if __name__ == '__main__':
+def main(datasets_dir=DATASETS_DIR):
+
+    datasets_dir = pathlib.Path(datasets_dir)
 
     # Obtains the base assets
-    df_cryptomap = pd.read_csv("./../../datasets/raw/cryptomap.csv.gz", index_col=0)
+    df_cryptomap = pd.read_csv(datasets_dir / "raw/cryptomap.csv.gz", index_col=0)
     base_assets = df_cryptomap['base_asset'].tolist()
 
     # Initializes the progress indicator variables
-    df_summary = pd.DataFrame(columns=['base_asset', 'n_twits', 'status', 'iterations', 'min_date'])
+    df_summary = pd.DataFrame(columns=['base_asset', 'n_twits', 'status', 'iterations', 'min_date', 'cache_hits'])
     safe_interrupt = mp.Manager().Event()
     status = mp.Manager().Queue()
     start = datetime.now()
 
     # Starts the pool to multiprocess the collection
     pool = mp.Pool(processes=mp.cpu_count(), maxtasksperchild=1)
-    dfs_twits = pool.starmap_async(get_twits, [(base_asset, status, safe_interrupt) for base_asset in base_assets])
+    dfs_twits = pool.starmap_async(get_twits, [(base_asset, status, safe_interrupt, datasets_dir) for base_asset in base_assets])
 
     try:
         while not dfs_twits.ready():
@@ -163,9 +195,14 @@ if __name__ == '__main__':
     pool.terminate()
     
     # Concatenates all temporary files and saves the result
-    df_twits, tmp_filenames = pd.DataFrame(), glob.glob("./../../datasets/raw/tmp/stocktwits/*.csv.gz")
+    df_twits, tmp_filenames = pd.DataFrame(), glob.glob(str(datasets_dir / "raw/tmp/stocktwits/*.csv.gz"))
     for tmp_filename in tmp_filenames:
         df_tmp = pd.read_csv(tmp_filename, index_col=0, low_memory=False)
         df_tmp['base_asset'] = pathlib.Path(tmp_filename).stem
         df_twits = pd.concat([df_twits, df_tmp], ignore_index=True)
-    df_twits.to_csv("./../../datasets/raw/twits.csv.gz")
\ No newline at end of file
+    df_twits.to_csv(datasets_dir / "raw/twits.csv.gz")
+
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
 import ast
-import os
 import pathlib
 import re
 import sys
@@ -7,10 +6,9 @@ from datetime import datetime
 
 import pandas as pd
 
-
-
-# Sets the current directory
-os.chdir(sys.path[0])
+# Makes the shared modules importable
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from common.paths import DATASETS_DIR
 
 
 
@@ -18,19 +16,18 @@ os.chdir(sys.path[0])
 #--- MAIN ---------------------#
 #------------------------------#
 
-if __name__ == '__main__':
+def main(start_date, end_date, datasets_dir=DATASETS_DIR):
 
-    # Gets the arguments of the script
-    _, START_DATE, END_DATE = tuple(sys.argv)
-    START_DATE = datetime.fromisoformat(START_DATE)
-    END_DATE = datetime.fromisoformat(END_DATE)
+    datasets_dir = pathlib.Path(datasets_dir)
 
     # Reads the dataset
-    df = pd.read_csv("./../../datasets/raw/twits.csv.gz", index_col=0)
+    df = pd.read_csv(datasets_dir / "raw/twits.csv.gz", index_col=0)
 
     # Performs basic operations
-    df = df[(df['date'] >= START_DATE) & (df['date'] < END_DATE)]
-    df.drop_duplicates(ignore_index=True, inplace=True)
+    df = df[(df['date'] >= start_date) & (df['date'] < end_date)]
+
+    # Drops duplicated twits by id (a twit tagging multiple base assets is kept once for each of them)
+    df = df[~df.duplicated(['base_asset', 'id'])].reset_index(drop=True)
 
     # Expands likes
     df = df.join(pd.json_normalize(df['likes'].map(lambda x: ast.literal_eval(x) if not pd.isna(x) else {}).tolist()).add_prefix("likes."))
@@ -63,9 +60,17 @@ if __name__ == '__main__':
     df = df[['id', 'date', 'base_asset', 'user_id', 'text', 'n_likes', 'n_reshares', 'label']]
 
     # Saves the twits dataframe
-    pathlib.Path("./../../datasets/processed").mkdir(parents=True, exist_ok=True)
-    df.to_csv("./../../datasets/processed/twits.csv.gz")
+    (datasets_dir / "processed").mkdir(parents=True, exist_ok=True)
+    df.to_csv(datasets_dir / "processed/twits.csv.gz")
 
     # Saves the users dataframe
-    pathlib.Path("./../../datasets/processed").mkdir(parents=True, exist_ok=True)
-    df_users.to_csv("./../../datasets/processed/users.csv.gz")
+    (datasets_dir / "processed").mkdir(parents=True, exist_ok=True)
+    df_users.to_csv(datasets_dir / "processed/users.csv.gz")
+
+
+
+if __name__ == '__main__':
+
+    # Gets the arguments of the script
+    _, START_DATE, END_DATE = tuple(sys.argv)
+    main(datetime.fromisoformat(START_DATE), datetime.fromisoformat(END_DATE))